@@ -6,6 +6,11 @@ import pandas as pd
 from datetime import datetime
 import sys
 import subprocess
+import os
+import time
+import tempfile
+import threading
+from html.parser import HTMLParser
 
 def check_tesseract():
     try:
@@ -16,10 +21,389 @@ def check_tesseract():
         st.error(f"Error details: {str(e)}")
         return None
 
+def check_pypdf():
+    try:
+        import pypdf
+        return pypdf
+    except ImportError as e:
+        st.error("pypdf import failed. Please check installation.")
+        st.error(f"Error details: {str(e)}")
+        return None
+
+# Total time OCR may spend on one receipt. Part of each OCR slot is held back
+# for a downscaled retry if the full-size image does not finish in time, and
+# the full-size attempt is skipped when its share would be too short to succeed.
+RECEIPT_BUDGET_SECONDS = 20
+DEGRADED_RESERVE_FRACTION = 0.25
+MIN_FULL_OCR_SECONDS = 2
+DEGRADED_MAX_SIDE = 1000
+OCR_POLL_SECONDS = 0.2
+
+class OCRTimeout(Exception):
+    pass
+
+class OCRStats:
+    """
+    OCR counters updated from the script threads of every session
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {'timeouts': 0, 'degraded': 0, 'cancelled': 0}
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts)
+
+@st.cache_resource
+def ocr_stats():
+    """
+    Process-wide OCR counters shared by all sessions
+    """
+    return OCRStats()
+
+def tesseract_to_string(pytesseract, image, timeout):
+    """
+    Run the tesseract binary on an image and return its text. The process is
+    killed when the timeout passes, or when Streamlit stops this script run
+    because the user re-ran the app or replaced the receipt.
+    """
+    if image.mode not in ('1', 'L', 'P', 'RGB', 'RGBA'):
+        image = image.convert('RGB')
+
+    status = st.empty()
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = os.path.join(tmp, 'receipt.png')
+        output_base = os.path.join(tmp, 'receipt')
+        image.save(image_path)
+
+        with open(os.path.join(tmp, 'stderr.txt'), 'w+b') as stderr:
+            proc = subprocess.Popen(
+                [pytesseract.pytesseract.tesseract_cmd, image_path, output_base],
+                stdout=subprocess.DEVNULL,
+                stderr=stderr,
+            )
+            started = time.monotonic()
+            timed_out = False
+            try:
+                while proc.poll() is None:
+                    if time.monotonic() - started >= timeout:
+                        timed_out = True
+                        break
+                    # Every element update is a point where Streamlit raises its
+                    # stop or rerun exception, which reaches the finally below
+                    status.caption(f"Running OCR... {time.monotonic() - started:.0f}s")
+                    time.sleep(OCR_POLL_SECONDS)
+            finally:
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+                    if not timed_out:
+                        ocr_stats().count('cancelled')
+
+            status.empty()
+            if timed_out:
+                ocr_stats().count('timeouts')
+                raise OCRTimeout()
+            if proc.returncode != 0:
+                stderr.seek(0)
+                raise RuntimeError(stderr.read().decode(errors='replace').strip())
+
+        with open(output_base + '.txt', encoding='utf-8') as f:
+            return f.read()
+
+def run_ocr(pytesseract, image, deadline):
+    """
+    Run OCR within the deadline, retrying on a downscaled grayscale copy when
+    the full-size image times out or too little time is left to try it
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise OCRTimeout()
+
+    full_size_timeout = remaining * (1 - DEGRADED_RESERVE_FRACTION)
+    if full_size_timeout >= MIN_FULL_OCR_SECONDS:
+        try:
+            return tesseract_to_string(pytesseract, image, full_size_timeout)
+        except OCRTimeout:
+            pass
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise OCRTimeout()
+
+    degraded = image.convert('L')
+    degraded.thumbnail((DEGRADED_MAX_SIDE, DEGRADED_MAX_SIDE))
+    ocr_stats().count('degraded')
+    return tesseract_to_string(pytesseract, degraded, remaining)
+
+# Maximum number of lines at the top of a receipt searched for the store name;
+# the header also ends at the first line that carries a price
+HEADER_LINES = 8
+
+PRICE_PATTERN = r'\$?\d+\.\d{2}'
+
+class VendorTemplate:
+    """
+    Precompiled parsing rules for one store's receipt layout.
+
+    `item` must capture `name` and `price`, where `price` is the extended
+    (line total) amount. `quantity` captures `qty` and `unit`, and optionally
+    `per` for "3 AT 2 FOR 1.00" style multi-buy pricing.
+    """
+    def __init__(self, name, keywords, item, total, discount=None, quantity=None,
+                 quantity_applies_to='previous', skip=None):
+        self.name = name
+        self.keywords = [normalize_header(k) for k in keywords]
+        self.item = re.compile(item, re.IGNORECASE) if item else None
+        self.total = re.compile(total, re.IGNORECASE)
+        self.discount = re.compile(discount, re.IGNORECASE) if discount else None
+        self.quantity = re.compile(quantity, re.IGNORECASE) if quantity else None
+        # Whether a standalone quantity line belongs to the item above or below it
+        self.quantity_applies_to = quantity_applies_to
+        self.skip = re.compile(skip, re.IGNORECASE) if skip else None
+
+    def match_item(self, line):
+        """
+        Return the (name, price) of an item row, or None
+        """
+        match = self.item.search(line)
+        if not match:
+            return None
+        item_name = clean_item_name(match.group('name'))
+        if not item_name:
+            return None
+        return item_name, float(match.group('price'))
+
+class GenericTemplate(VendorTemplate):
+    """
+    Fallback for stores without a template, using the original parsing rules:
+    the rightmost price on a line is the item price and the text before it the name
+    """
+    def match_item(self, line):
+        prices = re.findall(PRICE_PATTERN, line)
+        if not prices:
+            return None
+
+        # Get the last price in the line (rightmost)
+        price = prices[-1]
+
+        # Extract item name (everything before the last price)
+        item_name = line[:line.rfind(price)].strip()
+
+        # Remove any extra prices from the item name
+        for p in prices[:-1]:
+            item_name = item_name.replace(p, '').strip()
+
+        # Remove common separators and clean up the item name
+        item_name = re.sub(r'[.]{2,}|[@\t]+', ' ', item_name).strip()
+
+        # Only add if we have both an item name and price
+        if not item_name or item_name.isspace():
+            return None
+        return item_name, float(price.replace('$', ''))
+
+def normalize_header(text):
+    """
+    Lowercase a header line and collapse punctuation so 'WAL*MART' matches 'wal-mart'
+    """
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
+
+# Registered templates keyed by name, plus a keyword index over all of them.
+# Vendor detection looks each header n-gram up in the index, so its cost depends
+# on the header length rather than on how many templates are registered.
+VENDOR_TEMPLATES = {}
+_VENDOR_INDEX = {}
+_MAX_KEYWORD_WORDS = 1
+
+def register_vendor_template(template):
+    """
+    Add a template to the registry, replacing any template of the same name.
+    Raises ValueError if one of its keywords already belongs to another template.
+    """
+    global _MAX_KEYWORD_WORDS
+    for keyword in template.keywords:
+        owner = _VENDOR_INDEX.get(keyword)
+        if owner is not None and owner.name != template.name:
+            raise ValueError(f"Keyword '{keyword}' of template '{template.name}' "
+                             f"is already used by template '{owner.name}'")
+
+    old = VENDOR_TEMPLATES.get(template.name)
+    if old is not None:
+        for keyword in old.keywords:
+            del _VENDOR_INDEX[keyword]
+
+    VENDOR_TEMPLATES[template.name] = template
+    for keyword in template.keywords:
+        _VENDOR_INDEX[keyword] = template
+        _MAX_KEYWORD_WORDS = max(_MAX_KEYWORD_WORDS, len(keyword.split()))
+    return template
+
+GENERIC_TEMPLATE = GenericTemplate(
+    name='generic',
+    keywords=[],
+    item=None,
+    total=r'^\s*(?:grand\s+)?total\b\D*\$?(?P<price>\d+\.\d{2})',
+    # Substring match, as in the original skip list
+    skip=r'total|subtotal|tax|change|cash|credit|phone|receipt',
+)
+
+register_vendor_template(VendorTemplate(
+    name='walmart',
+    keywords=['walmart', 'wal mart', 'save money live better'],
+    # e.g. "GV 2% MILK 007874235186 F 2.98 N"
+    # The UPC is normally 12 digits but OCR often drops or merges one
+    item=r'^(?P<name>.+?)\s+\d{10,13}\s+(?:[A-Z]\s+)?\$?(?P<price>\d+\.\d{2})\s*[A-Z]?\s*$',
+    total=r'^\s*total\s+\$?(?P<price>\d+\.\d{2})',
+    discount=r'^(?P<name>.*?\b(?:rollback|price match|discount|coupon)\b.*?)\s+\$?(?P<price>\d+\.\d{2})-',
+    # e.g. "2 AT 1 FOR 0.98" printed under the item
+    quantity=r'^\s*(?P<qty>\d+)\s+at\s+(?P<per>\d+)\s+for\s+\$?(?P<unit>\d+\.\d{2})',
+    skip=r'^\W*(?:subtotal|tax|change due|debit tend|cash tend|visa|debit|tc#|st#|items sold)(?!\w)',
+))
+
+register_vendor_template(VendorTemplate(
+    name='target',
+    keywords=['target', 'expect more pay less'],
+    # e.g. "211030137 GOOD & GATHER MILK NF $3.49"; OCR may lose a DPCI digit or the "$"
+    item=r'^\s*\d{8,10}\s+(?P<name>.+?)\s+(?:[A-Z]{1,2}\s+)?\$?(?P<price>\d+\.\d{2})\s*$',
+    total=r'^\s*total\s+\$?(?P<price>\d+\.\d{2})',
+    discount=r'^(?P<name>.*?(?:circle|% off|discount|coupon).*?)\s+-\$?(?P<price>\d+\.\d{2})\s*$',
+    # e.g. "2 @ $1.99 ea" printed under the item
+    quantity=r'^\s*(?P<qty>\d+)\s*@\s*\$?(?P<unit>\d+\.\d{2})',
+    # Tax lines look like "T = MN TAX 6.87500 on $3.49"
+    skip=r'^\W*(?:subtotal|t\s*=|tax|visa|debit|redcard|change due|auth code)(?!\w)',
+))
+
+register_vendor_template(VendorTemplate(
+    name='costco',
+    keywords=['costco', 'costco wholesale'],
+    # e.g. "E 1234567 KS WATER 4.99 A"
+    item=r'^\s*(?:E\s+)?\d{4,7}\s+(?P<name>.*?[A-Za-z].*?)\s+(?P<price>\d+\.\d{2})\s*[A-Z]?\s*$',
+    total=r'^\s*\**\s*total\s+\$?(?P<price>\d+\.\d{2})',
+    # e.g. "E 345678 / 1234567 3.00-" instant savings against an earlier item
+    discount=r'^\s*(?:E\s+)?\d{4,7}\s*/\s*(?P<name>\d{4,7})\s+(?P<price>\d+\.\d{2})-',
+    skip=r'^\W*(?:subtotal|tax|visa|approved|change|member|total number of items sold)(?!\w)',
+))
+
+def detect_vendor(lines):
+    """
+    Find the vendor template whose keyword appears in the receipt header.
+    The header ends at the first priced line, so an item such as
+    "Target practice darts 5.00" does not pick a store.
+    """
+    for line in lines[:HEADER_LINES]:
+        if re.search(PRICE_PATTERN, line):
+            break
+        words = normalize_header(line).split()
+        for size in range(min(_MAX_KEYWORD_WORDS, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                template = _VENDOR_INDEX.get(' '.join(words[i:i + size]))
+                if template:
+                    return template
+    return GENERIC_TEMPLATE
+
+def clean_item_name(name):
+    # Remove any extra prices and common separators from the item name
+    name = re.sub(PRICE_PATTERN, '', name)
+    return re.sub(r'[.]{2,}|[@\t]+', ' ', name).strip()
+
+def quantity_amount(match):
+    """
+    Extended amount of a quantity line, e.g. "3 AT 2 FOR 1.00" is 1.50
+    """
+    per = int(match.groupdict().get('per') or 1) or 1
+    return round(int(match.group('qty')) * float(match.group('unit')) / per, 2)
+
+def parse_lines(lines, template):
+    """
+    Parse receipt lines with one template. Each row's `price` is the extended
+    (line total) amount, so the prices add up to the receipt total.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    items = []
+    receipt_total = None
+    pending = None
+
+    def add_item(name, quantity, price):
+        items.append({
+            'item': name,
+            'quantity': quantity,
+            'price': price,
+            'vendor': template.name,
+            'timestamp': timestamp
+        })
+
+    for line in lines:
+        match = template.total.search(line)
+        if match:
+            receipt_total = float(match.group('price'))
+            continue
+
+        if template.discount:
+            match = template.discount.search(line)
+            if match:
+                add_item(clean_item_name(match.group('name')) or 'Discount', 1, -float(match.group('price')))
+                continue
+
+        if template.skip and template.skip.search(line):
+            continue
+
+        if template.quantity:
+            match = template.quantity.search(line)
+            if match:
+                qty = int(match.group('qty'))
+                # Quantity printed on the item row itself, next to its line total
+                item = template.match_item(line[:match.start()] + line[match.end():])
+                if item:
+                    add_item(item[0], qty, item[1])
+                elif template.quantity_applies_to == 'next':
+                    pending = match
+                elif items:
+                    items[-1]['quantity'] = qty
+                    items[-1]['price'] = quantity_amount(match)
+                continue
+
+        item = template.match_item(line)
+        if not item and template is not GENERIC_TEMPLATE:
+            # Keep priced rows the store pattern misses, e.g. after OCR noise
+            item = GENERIC_TEMPLATE.match_item(line)
+        if item:
+            if pending:
+                add_item(item[0], int(pending.group('qty')), quantity_amount(pending))
+                pending = None
+            else:
+                add_item(item[0], 1, item[1])
+
+    return items, receipt_total
+
+def parse_receipt_text(text):
+    """
+    Parse receipt text into line items using the template of the detected vendor,
+    falling back to the generic rules if that template finds no items.
+    The printed receipt total, if found, is stored in df.attrs['receipt_total'].
+    """
+    lines = [line for line in text.split('\n') if line.strip()]
+    template = detect_vendor(lines)
+    items, receipt_total = parse_lines(lines, template)
+    if not items and template is not GENERIC_TEMPLATE:
+        template = GENERIC_TEMPLATE
+        items, receipt_total = parse_lines(lines, template)
+
+    # Create DataFrame and sort by price
+    df = pd.DataFrame(items)
+    if not df.empty:
+        df = df.sort_values('price', ascending=False)
+    df.attrs['vendor'] = template.name
+    df.attrs['receipt_total'] = receipt_total
+    return df
+
 def process_receipt_image(image):
     """
-    Process the receipt image using OCR and extract relevant information,
-    assuming left column contains text and right column contains numbers
+    Process the receipt image using OCR and extract relevant information
+    with the parsing template of the store that issued it
     """
     pytesseract = check_tesseract()
     if not pytesseract:
@@ -27,55 +411,155 @@ def process_receipt_image(image):
 
     try:
         # Convert the image to text using pytesseract
-        text = pytesseract.image_to_string(image)
+        text = run_ocr(pytesseract, image, time.monotonic() + RECEIPT_BUDGET_SECONDS)
         st.write("Extracted text:", text)  # Debug output
-        
-        # Parse the text to extract line items
-        lines = text.split('\n')
-        items = []
-        
-        # Enhanced parsing logic for left-text, right-number format
-        for line in lines:
-            # Skip empty lines and header/footer text
-            if not line.strip() or any(skip in line.lower() for skip in ['total', 'subtotal', 'tax', 'change', 'cash', 'credit', 'phone', 'receipt']):
-                continue
-            
-            # Look for price patterns at the end of the line
-            price_pattern = r'\$?\d+\.\d{2}'
-            prices = re.findall(price_pattern, line)
-            
-            if prices:
-                # Get the last price in the line (rightmost)
-                price = prices[-1]
-                
-                # Extract item name (everything before the last price)
-                item_name = line[:line.rfind(price)].strip()
-                
-                # Remove any extra prices from the item name
-                for p in prices[:-1]:
-                    item_name = item_name.replace(p, '').strip()
-                
-                # Remove common separators and clean up the item name
-                item_name = re.sub(r'[.]{2,}|[@\t]+', ' ', item_name).strip()
-                
-                # Only add if we have both an item name and price
-                if item_name and not item_name.isspace():
-                    items.append({
-                        'item': item_name,
-                        'price': float(price.replace('$', '')),
-                        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
-        
-        # Create DataFrame and sort by price
-        df = pd.DataFrame(items)
-        if not df.empty:
-            df = df.sort_values('price', ascending=False)
-        
-        return df
+
+        return parse_receipt_text(text)
+    except OCRTimeout:
+        st.warning(f"OCR did not finish within {RECEIPT_BUDGET_SECONDS} seconds, even on a downscaled copy. "
+                   "Try a sharper or smaller picture.")
+        return pd.DataFrame()
     except Exception as e:
         st.error(f"Error processing image: {str(e)}")
         return pd.DataFrame()
 
+class ReceiptHTMLParser(HTMLParser):
+    """
+    Collect the visible text of an HTML receipt, one table row or block per line
+    """
+    BLOCK_TAGS = {'br', 'p', 'div', 'tr', 'li', 'table', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+    HIDDEN_TAGS = {'script', 'style', 'head', 'title'}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.HIDDEN_TAGS:
+            self.hidden += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag in ('td', 'th'):
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in self.HIDDEN_TAGS:
+            self.hidden = max(self.hidden - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self.hidden:
+            self.parts.append(data)
+
+def html_to_text(markup):
+    parser = ReceiptHTMLParser()
+    parser.feed(markup)
+    parser.close()
+    lines = (' '.join(line.split()) for line in ''.join(parser.parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+def extract_pdf_text(data):
+    """
+    Read the embedded text layer of each PDF page, falling back to OCR of the
+    page images only for pages that have no text layer.
+    Returns the text and a list of (page number, reason) for scanned pages
+    that could not be read.
+    """
+    pypdf = check_pypdf()
+    if not pypdf:
+        return '', []
+
+    pages = pypdf.PdfReader(io.BytesIO(data)).pages
+    texts = []
+    for page in pages:
+        try:
+            texts.append(page.extract_text() or '')
+        except Exception:
+            # Treat a page whose text layer cannot be read as scanned
+            texts.append('')
+
+    # Images are only decoded when their turn comes, so one bad scan
+    # cannot take the rest of the document with it
+    scanned = [(i, k) for i, text in enumerate(texts) if not text.strip() for k in range(len(pages[i].images))]
+
+    skipped = []
+    def skip(i, reason):
+        if all(page != i + 1 for page, _ in skipped):
+            skipped.append((i + 1, reason))
+
+    pytesseract = check_tesseract() if scanned else None
+    if not pytesseract:
+        for i, _ in scanned:
+            skip(i, 'OCR is not available')
+        return '\n'.join(texts), skipped
+
+    # Split the receipt budget evenly over the images still to be read
+    deadline = time.monotonic() + RECEIPT_BUDGET_SECONDS
+    for n, (i, k) in enumerate(scanned):
+        share = (deadline - time.monotonic()) / (len(scanned) - n)
+        try:
+            image = pages[i].images[k].image
+        except Exception:
+            skip(i, 'image could not be decoded')
+            continue
+        try:
+            texts[i] += run_ocr(pytesseract, image, time.monotonic() + share) + '\n'
+        except OCRTimeout:
+            skip(i, 'OCR timed out')
+    return '\n'.join(texts), skipped
+
+def process_receipt_document(uploaded_file):
+    """
+    Extract line items from an uploaded PDF, text or HTML receipt without
+    running OCR on documents that already carry their text
+    """
+    name = uploaded_file.name.lower()
+    data = uploaded_file.getvalue()
+
+    try:
+        if name.endswith('.pdf'):
+            text, skipped = extract_pdf_text(data)
+            if skipped:
+                pages = ', '.join(f"{page} ({reason})" for page, reason in skipped)
+                st.warning(f"Could not read scanned page(s) {pages}; items from those pages are missing.")
+        elif name.endswith(('.html', '.htm')):
+            text = html_to_text(data.decode('utf-8', errors='replace'))
+        else:
+            text = data.decode('utf-8', errors='replace')
+        st.write("Extracted text:", text)  # Debug output
+
+        return parse_receipt_text(text)
+    except Exception as e:
+        st.error(f"Error processing document: {str(e)}")
+        return pd.DataFrame()
+
+def show_results(df):
+    if df.empty:
+        return
+
+    # Display the extracted items
+    st.subheader("Extracted Items")
+    st.dataframe(df)
+
+    # Add summary statistics
+    st.subheader("Summary")
+    st.write(f"Store: {df.attrs.get('vendor', 'generic')}")
+    st.write(f"Total Items: {len(df)}")
+    st.write(f"Total Amount: ${df['price'].sum():.2f}")
+    if df.attrs.get('receipt_total') is not None:
+        st.write(f"Printed Total: ${df.attrs['receipt_total']:.2f}")
+
+    # Add download button for CSV
+    csv = df.to_csv(index=False)
+    st.download_button(
+        label="Download data as CSV",
+        data=csv,
+        file_name="receipt_items.csv",
+        mime="text/csv",
+    )
+
 def main():
     st.title("Receipt Scanner")
     
@@ -90,51 +574,58 @@ def main():
     except Exception as e:
         st.sidebar.error(f"Tesseract not found: {str(e)}")
     
-    # Add file uploader that accepts images
-    image_file = st.camera_input("Take a picture of your receipt")
+    # Only the input for the chosen source is shown, so a stale picture or
+    # pasted text can never take the place of the receipt being processed
+    source = st.radio("Receipt source", ["Camera", "Upload file", "Paste text"], horizontal=True)
+    
+    if source == "Camera":
+        receipt = st.camera_input("Take a picture of your receipt")
+    elif source == "Upload file":
+        receipt = st.file_uploader(
+            "Upload a receipt image, PDF, text or HTML file",
+            type=['png', 'jpg', 'jpeg', 'pdf', 'txt', 'html', 'htm'],
+        )
+    else:
+        receipt = st.text_area("Paste the receipt text")
     
-    if image_file is not None:
+    if source == "Paste text":
+        if receipt.strip() and st.button('Process Receipt'):
+            with st.spinner('Processing receipt...'):
+                show_results(parse_receipt_text(receipt))
+    elif receipt is not None and source == "Upload file" and not receipt.name.lower().endswith(('.png', '.jpg', '.jpeg')):
+        # Digital receipts carry their own text, so no OCR is needed
+        if st.button('Process Receipt'):
+            with st.spinner('Processing receipt...'):
+                show_results(process_receipt_document(receipt))
+    elif receipt is not None:
         try:
             # Display the uploaded image
-            image = Image.open(image_file)
+            image = Image.open(receipt)
             st.image(image, caption='Uploaded Receipt', use_column_width=True)
             
             # Add a button to process the image
             if st.button('Process Receipt'):
                 with st.spinner('Processing receipt...'):
                     # Process the image and extract line items
-                    df = process_receipt_image(image)
-                    
-                    if not df.empty:
-                        # Display the extracted items
-                        st.subheader("Extracted Items")
-                        st.dataframe(df)
-                        
-                        # Add summary statistics
-                        st.subheader("Summary")
-                        st.write(f"Total Items: {len(df)}")
-                        st.write(f"Total Amount: ${df['price'].sum():.2f}")
-                        
-                        # Add download button for CSV
-                        csv = df.to_csv(index=False)
-                        st.download_button(
-                            label="Download data as CSV",
-                            data=csv,
-                            file_name="receipt_items.csv",
-                            mime="text/csv",
-                        )
+                    show_results(process_receipt_image(image))
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
     
+    stats = ocr_stats().snapshot()
+    st.sidebar.write(f"OCR timeouts: {stats['timeouts']}")
+    st.sidebar.write(f"Downscaled OCR retries: {stats['degraded']}")
+    st.sidebar.write(f"Cancelled OCR jobs: {stats['cancelled']}")
+    
     # Add some usage instructions
     st.markdown("""
     ### How to use:
-    1. Click the camera button to take a picture of your receipt
+    1. Choose a source, then take a picture of your receipt, upload an image, PDF, text or HTML receipt, or paste its text
     2. Make sure the receipt is well-lit and the text is clearly visible
     3. Click 'Process Receipt' to extract the items
     4. Download the extracted data as CSV if needed
     
     ### Tips for best results:
+    - E-mailed PDF, text and HTML receipts are read directly without OCR
     - Ensure good lighting when taking the picture
     - Keep the receipt flat and avoid wrinkles
     - Make sure all text is clearly visible
@@ -0,0 +1,14 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+APP_PATH = pathlib.Path(__file__).resolve().parent.parent / 'receipts-to-spreadsheet-v2.py'
+
+@pytest.fixture(scope='session')
+def app():
+    # The app is a Streamlit script with a hyphenated name, so load it by path
+    spec = importlib.util.spec_from_file_location('receipts_to_spreadsheet_v2', APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
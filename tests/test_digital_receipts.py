@@ -0,0 +1,102 @@
+import io
+import types
+
+import pytest
+from PIL import Image
+
+class FakeImages:
+    def __init__(self, images):
+        self._images = images
+
+    def __len__(self):
+        return len(self._images)
+
+    def __getitem__(self, k):
+        image = self._images[k]
+        if isinstance(image, Exception):
+            raise image
+        return types.SimpleNamespace(image=image)
+
+class FakePage:
+    def __init__(self, text, images=()):
+        self.text = text
+        self.images = FakeImages(list(images))
+
+    def extract_text(self):
+        return self.text
+
+def fake_pypdf(pages):
+    return types.SimpleNamespace(PdfReader=lambda stream: types.SimpleNamespace(pages=pages))
+
+def test_html_to_text_keeps_rows_and_drops_hidden_text(app):
+    markup = (
+        "<html><head><title>Order</title><style>td {}</style></head><body>"
+        "<h1>TARGET</h1><table><tr><td>211030137 MILK NF</td><td>$3.49</td></tr>"
+        "<tr><td>TOTAL</td><td>$3.49</td></tr></table><script>var x = 1;</script></body></html>"
+    )
+    assert app.html_to_text(markup) == "TARGET\n211030137 MILK NF $3.49\nTOTAL $3.49"
+
+def test_html_receipt_is_parsed_without_ocr(app, monkeypatch):
+    monkeypatch.setattr(app, 'check_tesseract', lambda: None)
+    uploaded = types.SimpleNamespace(
+        name='receipt.HTML',
+        getvalue=lambda: b"<p>Joe's Deli</p><p>Sandwich $7.50</p><p>Total $7.50</p>",
+    )
+    df = app.process_receipt_document(uploaded)
+    assert list(zip(df['item'], df['price'])) == [('Sandwich', 7.50)]
+    assert df.attrs['receipt_total'] == 7.50
+
+def test_pdf_text_layer_is_read_directly(app, monkeypatch):
+    def fail_ocr(*args):
+        raise AssertionError("OCR should not run on a page with a text layer")
+
+    monkeypatch.setattr(app, 'check_pypdf', lambda: fake_pypdf([FakePage("Sandwich 7.50")]))
+    monkeypatch.setattr(app, 'run_ocr', fail_ocr)
+    assert app.extract_pdf_text(b'') == ("Sandwich 7.50", [])
+
+def test_pdf_undecodable_scan_keeps_other_pages(app, monkeypatch):
+    pages = [
+        FakePage("Sandwich 7.50"),
+        FakePage("", [NotImplementedError("JBIG2Decode")]),
+        FakePage("", [Image.new('L', (10, 10))]),
+    ]
+    monkeypatch.setattr(app, 'check_pypdf', lambda: fake_pypdf(pages))
+    monkeypatch.setattr(app, 'check_tesseract', lambda: object())
+    monkeypatch.setattr(app, 'run_ocr', lambda pytesseract, image, deadline: "Coffee 2.25")
+
+    text, skipped = app.extract_pdf_text(b'')
+    assert "Sandwich 7.50" in text and "Coffee 2.25" in text
+    assert skipped == [(2, 'image could not be decoded')]
+
+def test_pdf_scanned_pages_reported_without_tesseract(app, monkeypatch):
+    pages = [FakePage("Sandwich 7.50"), FakePage("", [Image.new('L', (10, 10))])]
+    monkeypatch.setattr(app, 'check_pypdf', lambda: fake_pypdf(pages))
+    monkeypatch.setattr(app, 'check_tesseract', lambda: None)
+
+    text, skipped = app.extract_pdf_text(b'')
+    assert "Sandwich 7.50" in text
+    assert skipped == [(2, 'OCR is not available')]
+
+def test_real_pdf_text_layer(app):
+    pypdf = pytest.importorskip('pypdf')
+    writer = pypdf.PdfWriter()
+    page = writer.add_blank_page(200, 200)
+    font = writer._add_object(pypdf.generic.DictionaryObject({
+        pypdf.generic.NameObject('/Type'): pypdf.generic.NameObject('/Font'),
+        pypdf.generic.NameObject('/Subtype'): pypdf.generic.NameObject('/Type1'),
+        pypdf.generic.NameObject('/BaseFont'): pypdf.generic.NameObject('/Helvetica'),
+    }))
+    page[pypdf.generic.NameObject('/Resources')] = pypdf.generic.DictionaryObject({
+        pypdf.generic.NameObject('/Font'): pypdf.generic.DictionaryObject({
+            pypdf.generic.NameObject('/F1'): font,
+        }),
+    })
+    content = pypdf.generic.DecodedStreamObject()
+    content.set_data(b"BT /F1 12 Tf 10 150 Td (Sandwich 7.50) Tj ET")
+    page[pypdf.generic.NameObject('/Contents')] = writer._add_object(content)
+    stream = io.BytesIO()
+    writer.write(stream)
+
+    text, skipped = app.extract_pdf_text(stream.getvalue())
+    assert "Sandwich 7.50" in text
+    assert skipped == []
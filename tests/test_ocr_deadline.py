@@ -0,0 +1,121 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+from PIL import Image
+
+# Stands in for the tesseract binary: hangs on images wider than 1000 px,
+# otherwise writes a one-line receipt. Reads the width from the PNG header
+# so it starts quickly.
+STUB = '''#!{python}
+import os, struct, sys, time
+with open(sys.argv[1], 'rb') as f:
+    width = struct.unpack('>I', f.read(24)[16:20])[0]
+with open({pid_file!r}, 'w') as f:
+    f.write(str(os.getpid()))
+if width > {max_width}:
+    time.sleep(60)
+with open(sys.argv[2] + '.txt', 'w') as f:
+    f.write('Coffee 2.25\\n')
+'''
+
+def make_stub(tmp_path, max_width=1000):
+    path = tmp_path / 'tesseract'
+    path.write_text(STUB.format(python=sys.executable, pid_file=str(tmp_path / 'pid'), max_width=max_width))
+    path.chmod(0o755)
+    return types.SimpleNamespace(pytesseract=types.SimpleNamespace(tesseract_cmd=str(path)))
+
+def stub_pid(tmp_path):
+    return int((tmp_path / 'pid').read_text())
+
+def is_running(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().split()[2] != 'Z'
+    except FileNotFoundError:
+        return False
+
+def delta(app, before):
+    after = app.ocr_stats().snapshot()
+    return {name: after[name] - before[name] for name in after}
+
+@pytest.fixture
+def fast_budget(app, monkeypatch):
+    monkeypatch.setattr(app, 'MIN_FULL_OCR_SECONDS', 0.5)
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith('linux'), reason="uses /proc to check the stub process")
+
+def test_timeout_retries_on_downscaled_copy(app, tmp_path, fast_budget):
+    pytesseract = make_stub(tmp_path)
+    before = app.ocr_stats().snapshot()
+
+    text = app.run_ocr(pytesseract, Image.new('RGB', (3000, 4000)), time.monotonic() + 4)
+
+    assert text == 'Coffee 2.25\n'
+    assert delta(app, before) == {'timeouts': 1, 'degraded': 1, 'cancelled': 0}
+
+@linux_only
+def test_timeout_of_downscaled_copy_raises(app, tmp_path, monkeypatch, fast_budget):
+    monkeypatch.setattr(app, 'DEGRADED_MAX_SIDE', 2000)
+    pytesseract = make_stub(tmp_path)
+    before = app.ocr_stats().snapshot()
+
+    with pytest.raises(app.OCRTimeout):
+        app.run_ocr(pytesseract, Image.new('RGB', (3000, 4000)), time.monotonic() + 3)
+
+    assert delta(app, before) == {'timeouts': 2, 'degraded': 1, 'cancelled': 0}
+    assert not is_running(stub_pid(tmp_path))
+
+def test_short_budget_skips_full_size_attempt(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'MIN_FULL_OCR_SECONDS', 10)
+    pytesseract = make_stub(tmp_path)
+    before = app.ocr_stats().snapshot()
+
+    text = app.run_ocr(pytesseract, Image.new('RGB', (3000, 4000)), time.monotonic() + 5)
+
+    assert text == 'Coffee 2.25\n'
+    assert delta(app, before) == {'timeouts': 0, 'degraded': 1, 'cancelled': 0}
+
+@linux_only
+def test_stopped_script_run_kills_tesseract(app, tmp_path, monkeypatch):
+    class Stop(BaseException):
+        # Like Streamlit's StopException, raised from an element update
+        pass
+
+    class Placeholder:
+        calls = 0
+
+        def caption(self, text):
+            Placeholder.calls += 1
+            if Placeholder.calls >= 5:
+                raise Stop()
+
+        def empty(self):
+            pass
+
+    monkeypatch.setattr(app.st, 'empty', Placeholder)
+    pytesseract = make_stub(tmp_path)
+    before = app.ocr_stats().snapshot()
+
+    with pytest.raises(Stop):
+        app.tesseract_to_string(pytesseract, Image.new('RGB', (3000, 4000)), 30)
+
+    assert not is_running(stub_pid(tmp_path))
+    assert delta(app, before) == {'timeouts': 0, 'degraded': 0, 'cancelled': 1}
+
+def test_counts_are_not_lost_across_threads(app):
+    stats = app.OCRStats()
+
+    def count():
+        for _ in range(10000):
+            stats.count('timeouts')
+
+    threads = [threading.Thread(target=count) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stats.snapshot()['timeouts'] == 80000
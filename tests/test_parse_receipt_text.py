@@ -0,0 +1,113 @@
+import pytest
+
+WALMART = """WALMART SUPERCENTER
+Save money. Live better.
+NINTENDO SWITCH 045496882174 299.00 X
+GV 2% MILK 007874235186 F 2.98 N
+EGGS 00787423518 F 3.48 N
+BANANAS 000000004011 F 1.96 N
+3 AT 2 FOR 1.00
+ROLLBACK 0.50-
+SUBTOTAL 304.92
+TAX 1 7.000 % 20.93
+DEBIT TEND 325.85
+TOTAL 325.85
+"""
+
+TARGET = """Target Store T-1234
+Expect More. Pay Less.
+211030137 MILK NF $3.49
+2 @ $1.99 ea
+07404001 CHIPS $3.98
+074040010 TAXI TOY 2.49
+Circle 10% off -$0.40
+T = MN TAX 6.875 on $7.00
+SUBTOTAL $9.56
+TOTAL $10.22
+"""
+
+def rows(df):
+    return {row.item: (row.quantity, row.price) for row in df.itertuples()}
+
+def test_walmart_routing_and_ocr_noisy_rows(app):
+    df = app.parse_receipt_text(WALMART)
+    assert df.attrs['vendor'] == 'walmart'
+    assert df.attrs['receipt_total'] == 325.85
+    assert rows(df) == {
+        'NINTENDO SWITCH': (1, 299.00),
+        'GV 2% MILK': (1, 2.98),
+        # UPC with a digit lost to OCR
+        'EGGS': (1, 3.48),
+        # "3 AT 2 FOR 1.00" gives the line total
+        'BANANAS': (3, 1.50),
+        'ROLLBACK': (1, -0.50),
+    }
+
+def test_target_routing_quantity_and_discount(app):
+    df = app.parse_receipt_text(TARGET)
+    assert df.attrs['vendor'] == 'target'
+    assert rows(df) == {
+        'MILK': (2, 3.98),
+        # Short DPCI and missing "$"
+        'CHIPS': (1, 3.98),
+        'TAXI TOY': (1, 2.49),
+        'Circle 10% off': (1, -0.40),
+    }
+
+def test_vendor_row_missed_by_store_pattern_uses_generic_rule(app):
+    df = app.parse_receipt_text("Welcome to Costco\nE 1234567 KS WATER 4.99 A\nHOT DOG COMBO 1.50\nTOTAL 6.49")
+    assert df.attrs['vendor'] == 'costco'
+    assert rows(df) == {'KS WATER': (1, 4.99), 'HOT DOG COMBO': (1, 1.50)}
+
+@pytest.mark.parametrize('header, vendor', [
+    ('Walmart Supercenter', 'walmart'),
+    ('WAL*MART', 'walmart'),
+    ('Target Store T-1234', 'target'),
+    ('Welcome to Costco', 'costco'),
+    ("Joe's Deli", 'generic'),
+])
+def test_detect_vendor(app, header, vendor):
+    assert app.detect_vendor([header, '123 Main St', 'Milk 3.99']).name == vendor
+
+def test_store_name_in_item_row_is_not_a_header(app):
+    df = app.parse_receipt_text("Corner Market\nTarget practice darts 5.00\nMilk 3.99")
+    assert df.attrs['vendor'] == 'generic'
+    assert rows(df) == {'Target practice darts': (1, 5.00), 'Milk': (1, 3.99)}
+
+def test_generic_rules_match_original_parser(app):
+    df = app.parse_receipt_text(
+        "Joe's Deli\nSandwich ....... $7.50\nBread 2.49 2\n2 x 1.25 2.50\n"
+        "Coupon savings 1.00\nTax 0.50\nTotal 9.25"
+    )
+    assert df.attrs['vendor'] == 'generic'
+    assert df.attrs['receipt_total'] == 9.25
+    assert list(zip(df['item'], df['price'])) == [
+        ('Sandwich', 7.50), ('2 x', 2.50), ('Bread', 2.49), ('Coupon savings', 1.00),
+    ]
+
+def test_quantity_line_before_any_item_is_ignored(app):
+    df = app.parse_receipt_text("TARGET\n2 @ $1.99 ea\n211030137 MILK NF $3.49")
+    assert rows(df) == {'MILK': (1, 3.49)}
+
+@pytest.fixture
+def registry(app, monkeypatch):
+    # Register test templates on copies so other tests see the shipped registry
+    monkeypatch.setattr(app, 'VENDOR_TEMPLATES', dict(app.VENDOR_TEMPLATES))
+    monkeypatch.setattr(app, '_VENDOR_INDEX', dict(app._VENDOR_INDEX))
+    monkeypatch.setattr(app, '_MAX_KEYWORD_WORDS', app._MAX_KEYWORD_WORDS)
+    return app
+
+def test_register_vendor_template_rejects_keyword_collision(registry):
+    app = registry
+    template = app.VendorTemplate('walmart-copy', ['walmart'], item=r'(?P<name>\w+) (?P<price>\d+\.\d{2})', total='x')
+    with pytest.raises(ValueError):
+        app.register_vendor_template(template)
+    assert 'walmart-copy' not in app.VENDOR_TEMPLATES
+
+def test_register_vendor_template_replaces_same_name(registry):
+    app = registry
+    item = r'(?P<name>\w+) (?P<price>\d+\.\d{2})'
+    app.register_vendor_template(app.VendorTemplate('corner', ['corner market'], item=item, total='x'))
+    app.register_vendor_template(app.VendorTemplate('corner', ['corner mart'], item=item, total='x'))
+    assert 'corner market' not in app._VENDOR_INDEX
+    assert app._VENDOR_INDEX['corner mart'] is app.VENDOR_TEMPLATES['corner']